@@ -1,11 +1,17 @@
 """
 Evaluation metrics for retrieval and QA performance
 """
-from typing import List, Set, Any
+from typing import List, Set, Any, Dict
+from functools import lru_cache
+from itertools import islice
 import numpy as np
-from collections import Counter
+from scipy import sparse
 import re
 
+# Precompiled patterns for answer normalization
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
 
 def compute_exact_match(prediction: str, ground_truth: str) -> float:
     """
@@ -42,8 +48,7 @@ def compute_f1(prediction: str, ground_truth: str) -> float:
     if len(pred_tokens) == 0 or len(gt_tokens) == 0:
         return 0.0
 
-    common = Counter(pred_tokens) & Counter(gt_tokens)
-    num_common = sum(common.values())
+    num_common = _count_common_tokens(pred_tokens, gt_tokens)
 
     if num_common == 0:
         return 0.0
@@ -55,6 +60,99 @@ def compute_f1(prediction: str, ground_truth: str) -> float:
     return f1
 
 
+def _count_common_tokens(pred_tokens: List[str], gt_tokens: List[str]) -> int:
+    """Size of the multiset intersection of two token lists"""
+    pred_counts = {}
+    pred_get = pred_counts.get
+    for token in pred_tokens:
+        pred_counts[token] = pred_get(token, 0) + 1
+
+    gt_counts = {}
+    gt_get = gt_counts.get
+    for token in gt_tokens:
+        gt_counts[token] = gt_get(token, 0) + 1
+
+    # Iterate the smaller multiset
+    if len(gt_counts) < len(pred_counts):
+        pred_counts, gt_counts = gt_counts, pred_counts
+
+    other_get = gt_counts.get
+    return sum(min(count, other_get(token, 0)) for token, count in pred_counts.items())
+
+
+def compute_exact_match_batch(predictions: List[str], ground_truths: List[str]) -> np.ndarray:
+    """
+    Compute exact match scores for many prediction/ground truth pairs at once
+
+    Args:
+        predictions: Predicted answers
+        ground_truths: Ground truth answers (same length as predictions)
+
+    Returns:
+        Array of 1.0/0.0 exact match scores
+    """
+    pred_norm = np.array([normalize_answer(p) for p in predictions], dtype=object)
+    gt_norm = np.array([normalize_answer(g) for g in ground_truths], dtype=object)
+
+    return (pred_norm == gt_norm).astype(np.float32)
+
+
+def compute_f1_batch(predictions: List[str], ground_truths: List[str]) -> np.ndarray:
+    """
+    Compute F1 scores for many prediction/ground truth pairs at once
+
+    Tokens are mapped to integer ids over a shared vocabulary so the token
+    overlap of every pair is computed in a single sparse matrix operation.
+
+    Args:
+        predictions: Predicted answers
+        ground_truths: Ground truth answers (same length as predictions)
+
+    Returns:
+        Array of F1 scores
+    """
+    vocab = {}
+    pred_indices, pred_indptr = _tokens_to_ids(predictions, vocab)
+    gt_indices, gt_indptr = _tokens_to_ids(ground_truths, vocab)
+
+    shape = (len(pred_indptr) - 1, max(len(vocab), 1))
+    pred_counts = _count_matrix(pred_indices, pred_indptr, shape)
+    gt_counts = _count_matrix(gt_indices, gt_indptr, shape)
+
+    # Multiset intersection size per row
+    num_common = np.asarray(pred_counts.minimum(gt_counts).sum(axis=1)).ravel()
+    pred_len = np.diff(pred_indptr)
+    gt_len = np.diff(gt_indptr)
+
+    f1 = np.zeros(shape[0], dtype=np.float64)
+    mask = num_common > 0
+    precision = num_common[mask] / pred_len[mask]
+    recall = num_common[mask] / gt_len[mask]
+    f1[mask] = 2 * (precision * recall) / (precision + recall)
+
+    return f1
+
+
+def _tokens_to_ids(texts: List[str], vocab: dict) -> tuple:
+    """Normalize and tokenize texts into flat token-id / row-pointer arrays"""
+    indices = []
+    indptr = [0]
+    setdefault = vocab.setdefault
+    for text in texts:
+        indices.extend(setdefault(token, len(vocab)) for token in normalize_answer(text).split())
+        indptr.append(len(indices))
+
+    return np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)
+
+
+def _count_matrix(indices: np.ndarray, indptr: np.ndarray, shape: tuple) -> sparse.csr_matrix:
+    """Build a (texts x vocab) token count matrix"""
+    data = np.ones(len(indices), dtype=np.int64)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=shape)
+    matrix.sum_duplicates()
+    return matrix
+
+
 def compute_recall_at_k(retrieved: List[Any], relevant: Set[Any], k: int) -> float:
     """
     Compute Recall@k
@@ -70,10 +168,44 @@ def compute_recall_at_k(retrieved: List[Any], relevant: Set[Any], k: int) -> flo
     if len(relevant) == 0:
         return 0.0
 
-    retrieved_at_k = set(retrieved[:k])
-    num_relevant_retrieved = len(retrieved_at_k & relevant)
+    # Scan the top k, stopping as soon as every relevant item has been found
+    found = set()
+    for item in islice(retrieved, k):
+        if item in relevant:
+            found.add(item)
+            if len(found) == len(relevant):
+                break
+
+    return len(found) / len(relevant)
 
-    return num_relevant_retrieved / len(relevant)
+
+def compute_recall_at_ks(retrieved: List[Any], relevant: Set[Any], ks: List[int]) -> Dict[int, float]:
+    """
+    Compute Recall@k for several cutoffs in a single pass over the ranking
+
+    Args:
+        retrieved: List of retrieved items (ordered by rank)
+        relevant: Set of relevant items
+        ks: Cutoff positions
+
+    Returns:
+        Dictionary mapping each k to its Recall@k score
+    """
+    if len(relevant) == 0 or not ks:
+        return {k: 0.0 for k in ks}
+
+    # Rank of the first occurrence of each relevant item
+    found = set()
+    hit_ranks = []
+    for rank, item in enumerate(islice(retrieved, max(ks))):
+        if item in relevant and item not in found:
+            found.add(item)
+            hit_ranks.append(rank)
+
+    # Number of hits ranked strictly before each cutoff
+    counts = np.searchsorted(np.asarray(hit_ranks, dtype=np.int64), ks)
+
+    return {k: int(count) / len(relevant) for k, count in zip(ks, counts)}
 
 
 def compute_mrr(retrieved: List[Any], relevant: Set[Any]) -> float:
@@ -94,6 +226,95 @@ def compute_mrr(retrieved: List[Any], relevant: Set[Any]) -> float:
     return 0.0
 
 
+def compute_ndcg_at_k(retrieved: List[Any], relevant: Set[Any], k: int) -> float:
+    """
+    Compute nDCG@k with binary relevance
+
+    Args:
+        retrieved: List of retrieved items (ordered by rank)
+        relevant: Set of relevant items
+        k: Cutoff position
+
+    Returns:
+        nDCG@k score
+    """
+    if len(relevant) == 0 or k <= 0:
+        return 0.0
+
+    hits = _hit_vector(islice(retrieved, k), relevant)
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+
+    dcg = float(hits @ discounts[:len(hits)])
+    idcg = float(discounts[:min(len(relevant), k)].sum())
+
+    return dcg / idcg
+
+
+def compute_retrieval_metrics(
+    retrieved: List[Any],
+    relevant: Set[Any],
+    ks: List[int] = (1, 5, 10, 20)
+) -> Dict[str, Any]:
+    """
+    Compute Recall@k, nDCG@k and MRR from a single pass over the ranking
+
+    Args:
+        retrieved: List of retrieved items (ordered by rank)
+        relevant: Set of relevant items
+        ks: Cutoff positions for Recall@k and nDCG@k
+
+    Returns:
+        Dictionary with 'recall' and 'ndcg' (each mapping k to score) and 'mrr'
+    """
+    ks = list(ks)
+    if len(relevant) == 0:
+        return {
+            'recall': {k: 0.0 for k in ks},
+            'ndcg': {k: 0.0 for k in ks},
+            'mrr': 0.0
+        }
+
+    hits = _hit_vector(retrieved, relevant)
+
+    # Recall@k from the running hit count
+    cum_hits = np.concatenate(([0], np.cumsum(hits)))
+    num_relevant = len(relevant)
+    recall = {k: float(cum_hits[min(k, len(hits))]) / num_relevant for k in ks}
+
+    # nDCG@k from the running discounted gain
+    max_k = max(ks) if ks else 0
+    discounts = 1.0 / np.log2(np.arange(2, max_k + 2))
+    n = min(max_k, len(hits))
+    cum_dcg = np.concatenate(([0.0], np.cumsum(hits[:n] * discounts[:n])))
+    cum_idcg = np.concatenate(([0.0], np.cumsum(discounts)))
+    ndcg = {
+        k: float(cum_dcg[min(k, n)] / cum_idcg[min(k, num_relevant)]) if k > 0 else 0.0
+        for k in ks
+    }
+
+    # MRR from the first hit
+    mrr = 1.0 / (int(np.argmax(hits)) + 1) if hits.any() else 0.0
+
+    return {
+        'recall': recall,
+        'ndcg': ndcg,
+        'mrr': mrr
+    }
+
+
+def _hit_vector(retrieved, relevant: Set[Any]) -> np.ndarray:
+    """Binary relevance vector, counting each relevant item at its first rank only"""
+    found = set()
+    hits = []
+    for item in retrieved:
+        is_hit = item in relevant and item not in found
+        if is_hit:
+            found.add(item)
+        hits.append(is_hit)
+
+    return np.asarray(hits, dtype=np.int8)
+
+
 def compute_mae_mape(predictions: List[float], ground_truth: List[float]) -> tuple:
     """
     Compute MAE and MAPE for numeric answers
@@ -105,16 +326,20 @@ def compute_mae_mape(predictions: List[float], ground_truth: List[float]) -> tup
     Returns:
         Tuple of (MAE, MAPE)
     """
-    predictions = np.array(predictions)
-    ground_truth = np.array(ground_truth)
+    predictions = np.asarray(predictions, dtype=np.float64)
+    ground_truth = np.asarray(ground_truth, dtype=np.float64)
+
+    # Absolute error, computed once and reused (in place) for both metrics
+    abs_diff = predictions - ground_truth
+    np.abs(abs_diff, out=abs_diff)
 
     # MAE
-    mae = np.mean(np.abs(predictions - ground_truth))
+    mae = abs_diff.mean()
 
     # MAPE
-    mape = np.mean(np.abs((predictions - ground_truth) / ground_truth)) * 100
+    mape = (abs_diff / np.abs(ground_truth)).mean() * 100.0
 
-    return mae, mape
+    return float(mae), float(mape)
 
 
 def compute_faithfulness(answer: str, evidence: List[str]) -> float:
@@ -129,29 +354,31 @@ def compute_faithfulness(answer: str, evidence: List[str]) -> float:
         Faithfulness score (0-1)
     """
     # Simple implementation: check if answer tokens appear in evidence
-    answer_tokens = set(normalize_answer(answer).split())
+    # Tokens are compared as unique 64-bit hashes rather than strings
+    answer_hashes = _unique_token_hashes([answer])
 
-    if len(answer_tokens) == 0:
+    if answer_hashes.size == 0:
         return 0.0
 
-    evidence_text = " ".join(evidence)
-    evidence_tokens = set(normalize_answer(evidence_text).split())
+    # Evidence pieces are normalized one by one so repeated pieces hit the cache
+    evidence_hashes = _unique_token_hashes(evidence)
 
-    supported_tokens = answer_tokens & evidence_tokens
-    faithfulness = len(supported_tokens) / len(answer_tokens)
+    supported = np.isin(answer_hashes, evidence_hashes, assume_unique=True).sum()
+    faithfulness = supported / answer_hashes.size
 
-    return faithfulness
+    return float(faithfulness)
 
 
-def normalize_answer(text: str) -> str:
-    """Normalize answer text for comparison"""
-    # Lowercase
-    text = text.lower()
+def _unique_token_hashes(texts: List[str]) -> np.ndarray:
+    """Unique hashes of the normalized tokens of texts"""
+    hashes = {hash(token) for text in texts for token in normalize_answer(text).split()}
+    return np.fromiter(hashes, dtype=np.int64, count=len(hashes))
 
-    # Remove punctuation
-    text = re.sub(r'[^\w\s]', ' ', text)
 
-    # Remove extra whitespace
-    text = ' '.join(text.split())
+@lru_cache(maxsize=131072)
+def normalize_answer(text: str) -> str:
+    """Normalize answer text for comparison"""
+    # Lowercase, remove punctuation and collapse whitespace
+    text = _WS_RE.sub(' ', _PUNCT_RE.sub(' ', text.lower())).strip()
 
     return text
@@ -5,6 +5,10 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 import re
 
+from .section_extractor import SectionExtractor
+
+_WS_RE = re.compile(r'\s+')
+
 
 class FilingParser:
     """Parse 10-K filings (PDF or HTML) into structured components"""
@@ -15,7 +19,8 @@ class FilingParser:
         # - docling or PyMuPDF for PDF parsing
         # - BeautifulSoup for HTML parsing
         # - Tesseract for OCR
-        pass
+
+        self.section_extractor = SectionExtractor()
 
     def parse(
         self,
@@ -45,42 +50,34 @@ class FilingParser:
 
     def _parse_html(self, file_path: str, ticker: str, fiscal_year: int) -> Dict[str, Any]:
         """Parse HTML filing"""
-        from bs4 import BeautifulSoup
+        from bs4 import BeautifulSoup, SoupStrainer
 
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                html_content = f.read()
+            # Read raw bytes; encoding is detected once while parsing
+            with open(file_path, 'rb') as f:
+                html_bytes = f.read()
 
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Only build the <body> subtree; <head> content is never needed
+            soup = BeautifulSoup(html_bytes, 'lxml', parse_only=SoupStrainer('body'))
 
             # Remove script and style elements
             for script in soup(["script", "style"]):
                 script.decompose()
 
-            # Extract all text
-            text = soup.get_text(separator=' ', strip=True)
-
-            # Clean up whitespace
-            text = re.sub(r'\s+', ' ', text)
-
-            # Split into sections (simple chunking approach)
-            sections = []
-            chunk_size = 5000
-            for i in range(0, min(len(text), 50000), chunk_size):  # Limit to first 50k chars
-                if i + chunk_size > len(text):
-                    break
-                sections.append({
-                    'title': f'Section {i // chunk_size + 1}',
-                    'content': text[i:i + chunk_size]
-                })
+            # Extract all text and collapse whitespace
+            text = _WS_RE.sub(' ', soup.get_text(separator=' ', strip=True))
+
+            # Split into sections at 10-K headings
+            sections = self.section_extractor.split_sections(text[:50000])  # Limit to first 50k chars
 
             # Extract tables (basic - find <table> tags)
             tables = []
-            html_tables = soup.find_all('table')
-            for idx, table in enumerate(html_tables[:10]):  # Limit to first 10 tables
+            html_tables = soup.find_all('table', limit=10)  # Limit to first 10 tables
+            for idx, table in enumerate(html_tables):
+                # Keep the parsed tag; TableParser reads it without re-parsing
                 tables.append({
                     'table_id': f'T{idx+1}',
-                    'html': str(table)
+                    'html': table
                 })
 
             return {
@@ -2,8 +2,12 @@
 Section extractor for identifying and extracting key sections from 10-K filings
 """
 from typing import List, Dict, Any
+from functools import lru_cache
+from itertools import islice
 import re
 
+_WORD_RE = re.compile(r'\S+')
+
 
 class SectionExtractor:
     """Extract key sections from 10-K filings"""
@@ -14,11 +18,24 @@ class SectionExtractor:
         self.section_patterns = {
             'Item 1': r'Item\s+1[.:\s]+Business',
             'Item 1A': r'Item\s+1A[.:\s]+Risk\s+Factors',
-            'Item 7': r'Item\s+7[.:\s]+Management.*Discussion',
+            'Item 7': r'Item\s+7[.:\s]+Management.*?Discussion',
             'Item 8': r'Item\s+8[.:\s]+Financial\s+Statements',
             'Notes': r'Notes\s+to\s+(Consolidated\s+)?Financial\s+Statements'
         }
 
+        # All patterns combined into one alternation with a named group per
+        # section, so every heading is found in a single scan of the text
+        self._group_to_section = {
+            re.sub(r'\W', '', name).lower(): name for name in self.section_patterns
+        }
+        self._combined = re.compile(
+            '|'.join(
+                f'(?P<{group}>{self.section_patterns[name]})'
+                for group, name in self._group_to_section.items()
+            ),
+            re.IGNORECASE
+        )
+
     def extract_sections(
         self,
         parsed_doc: Dict,
@@ -41,12 +58,55 @@ class SectionExtractor:
         if not sections:
             return []
 
+        # Raw document text: split it at section headings
+        if isinstance(sections, str):
+            return self.split_sections(sections)
+
         # If sections is a list of strings instead of dicts, convert them
         if sections and isinstance(sections[0], str):
             sections = [{'title': f'Section {i+1}', 'content': s} for i, s in enumerate(sections)]
 
         return sections
 
+    def split_sections(self, text: str, chunk_size: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Split raw document text into sections at 10-K headings
+
+        Args:
+            text: Full document text
+            chunk_size: Size of fixed chunks used when no heading is found
+
+        Returns:
+            List of section dictionaries
+        """
+        matches = list(self._combined.finditer(text))
+
+        if not matches:
+            # Simple chunking approach
+            return [
+                {'title': f'Section {j + 1}', 'content': text[j * chunk_size:(j + 1) * chunk_size]}
+                for j in range(len(text) // chunk_size)
+            ]
+
+        sections = []
+
+        # Keep any text before the first heading as its own section
+        if matches[0].start() > 0:
+            sections.append({
+                'title': 'Preamble',
+                'content': text[:matches[0].start()].strip()
+            })
+
+        ends = [m.start() for m in matches[1:]] + [len(text)]
+        for match, end in zip(matches, ends):
+            sections.append({
+                'title': match.group(0),
+                'section_id': self._group_to_section[match.lastgroup],
+                'content': text[match.start():end].strip()
+            })
+
+        return sections
+
     def create_section_abstract(self, section: Dict, max_words: int = 200) -> str:
         """
         Create abstract of section (title + first N words)
@@ -58,11 +118,14 @@ class SectionExtractor:
         Returns:
             Section abstract string
         """
-        title = section['title']
-        content = section['content']
+        return _section_abstract(section['title'], section['content'], max_words)
+
 
-        # Take first max_words
-        words = content.split()[:max_words]
-        abstract = title + ". " + " ".join(words)
+@lru_cache(maxsize=4096)
+def _section_abstract(title: str, content: str, max_words: int) -> str:
+    """Build (and cache) a section abstract"""
+    # Take first max_words, without splitting the rest of the content
+    words = (m.group(0) for m in islice(_WORD_RE.finditer(content), max_words))
+    abstract = title + ". " + " ".join(words)
 
-        return abstract
+    return abstract
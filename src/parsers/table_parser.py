@@ -47,9 +47,12 @@ class TableParser:
         """Parse table into structured DataFrame"""
         # Check if we have HTML table
         if 'html' in raw_table:
+            html = raw_table['html']
+
+            # Walk the table with BeautifulSoup (already-parsed tags are used as is)
             try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(raw_table['html'], 'html.parser')
+                from bs4 import BeautifulSoup, Tag
+                soup = html if isinstance(html, Tag) else BeautifulSoup(html, 'html.parser')
 
                 # Extract rows
                 rows = []
@@ -114,32 +117,39 @@ class TableParser:
             # Create natural language sentence for each table row
             # Converts structured tabular data into searchable text
             # Uses column headers as context and formats numbers with proper units
-            for idx, row in data.iterrows():
-                row_sentence = self._row_to_sentence(row, data.columns, table)
+            row_sentences = self._rows_to_sentences(data)
+            columns = list(data.columns)
 
+            for idx, row_sentence, values in zip(data.index, row_sentences, data.values.tolist()):
                 sentences.append({
                     'sentence': row_sentence,
                     'table_id': table_id,
                     'section': section,
                     'row_idx': idx,
-                    'raw_data': row.to_dict()
+                    'raw_data': dict(zip(columns, values))
                 })
 
         return sentences
 
-    def _row_to_sentence(
-        self,
-        row: pd.Series,
-        columns: pd.Index,
-        table: Dict
-    ) -> str:
+    def _rows_to_sentences(self, data: pd.DataFrame) -> pd.Series:
         """
-        Convert a table row to a natural language sentence
+        Convert all table rows to natural language sentences at once
 
         Formats table data as readable sentences for better retrieval
         Example output: "Revenue in 2024 was $100M compared to $90M in 2023"
         """
-        row_name = row.iloc[0] if len(row) > 0 else "Unknown"
-        values = " ".join([str(v) for v in row.iloc[1:]])
+        # Cell-wise str() so missing cells read 'nan'/'None' as before
+        # (astype(str) keeps them as NaN on newer pandas)
+        str_data = data.astype(object).apply(lambda column: column.map(str))
+        row_names = str_data.iloc[:, 0]
+
+        if str_data.shape[1] < 2:
+            return row_names + ': '
+
+        # Column-wise concatenation of the remaining cells
+        values = str_data.iloc[:, 1].str.cat(
+            [str_data.iloc[:, j] for j in range(2, str_data.shape[1])],
+            sep=' '
+        )
 
-        return f"{row_name}: {values}"
+        return row_names + ': ' + values
@@ -2,11 +2,35 @@
 Answer generator using LLM to create responses from retrieved evidence
 """
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import re
 
 
 class AnswerGenerator:
     """Generate answers using LLM reader model"""
 
+    # Citation markers looked for in generated answers
+    _CITE_RE = re.compile(r'Table|Section|Row')
+
+    # System instruction
+    _SYSTEM_MSG = """You are a financial analyst assistant. Answer questions about SEC 10-K filings based ONLY on the provided evidence.
+
+IMPORTANT RULES:
+1. Keep answers concise (2-5 sentences)
+2. ALWAYS cite sources (section name, table ID, row/column)
+3. Show units for all numbers (millions, thousands, etc.)
+4. If evidence is insufficient, say so - do not guess
+5. For numeric questions, show the calculation
+"""
+
+    _PROMPT_TEMPLATE = """{system_msg}
+
+{evidence_text}
+
+QUESTION: {query}
+
+ANSWER (include citations):"""
+
     def __init__(
         self,
         use_openai: bool = False,
@@ -46,11 +70,17 @@ class AnswerGenerator:
             # Initialize Ollama client
             try:
                 import requests
+                from requests.adapters import HTTPAdapter
                 self.ollama_model = ollama_model
                 self.ollama_base_url = ollama_base_url
                 self.requests = requests
+                # Persistent session so connections are reused across calls
+                self.session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                self.session.mount('http://', adapter)
+                self.session.mount('https://', adapter)
                 # Test connection
-                response = requests.get(f"{ollama_base_url}/api/tags")
+                response = self.session.get(f"{ollama_base_url}/api/tags")
                 if response.status_code == 200:
                     print(f"✓ Ollama client initialized (model: {ollama_model})")
                 else:
@@ -98,6 +128,31 @@ class AnswerGenerator:
             'confidence': self._estimate_confidence(answer, evidence)
         }
 
+    def generate_batch(
+        self,
+        queries: List[str],
+        evidence_list: List[List[Dict[str, Any]]],
+        route_infos: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate answers for many queries concurrently
+
+        LLM calls are I/O-bound, so requests are issued from a bounded
+        thread pool instead of one after another.
+
+        Args:
+            queries: User queries
+            evidence_list: Retrieved evidence for each query
+            route_infos: Query routing information for each query
+            max_concurrency: Maximum number of in-flight LLM requests
+
+        Returns:
+            List of answer dictionaries, in the same order as queries
+        """
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(self.generate, queries, evidence_list, route_infos))
+
     def _build_prompt(
         self,
         query: str,
@@ -106,39 +161,25 @@ class AnswerGenerator:
     ) -> str:
         """Build prompt for LLM"""
 
-        # System instruction
-        system_msg = """You are a financial analyst assistant. Answer questions about SEC 10-K filings based ONLY on the provided evidence.
-
-IMPORTANT RULES:
-1. Keep answers concise (2-5 sentences)
-2. ALWAYS cite sources (section name, table ID, row/column)
-3. Show units for all numbers (millions, thousands, etc.)
-4. If evidence is insufficient, say so - do not guess
-5. For numeric questions, show the calculation
-"""
-
         # Format evidence
-        evidence_text = "EVIDENCE:\n\n"
+        parts = ["EVIDENCE:\n\n"]
         for i, ev in enumerate(evidence[:5]):  # Top 5 pieces
             meta = ev['metadata']
-            content = ev['content']
             content_type = meta['content_type']
 
             if content_type == 'table':
-                evidence_text += f"[TABLE] {meta['ticker']} {meta['fiscal_year']} - Table {meta['table_id']}, Row {meta['row_idx']}\n"
+                parts.append(f"[TABLE] {meta['ticker']} {meta['fiscal_year']} - Table {meta['table_id']}, Row {meta['row_idx']}\n")
             else:
-                evidence_text += f"[TEXT] {meta['ticker']} {meta['fiscal_year']} - {meta.get('section_title', 'N/A')}\n"
+                parts.append(f"[TEXT] {meta['ticker']} {meta['fiscal_year']} - {meta.get('section_title', 'N/A')}\n")
 
-            evidence_text += f"{content}\n\n"
+            parts.append(f"{ev['content']}\n\n")
 
         # Build full prompt
-        prompt = f"""{system_msg}
-
-{evidence_text}
-
-QUESTION: {query}
-
-ANSWER (include citations):"""
+        prompt = self._PROMPT_TEMPLATE.format_map({
+            'system_msg': self._SYSTEM_MSG,
+            'evidence_text': "".join(parts),
+            'query': query
+        })
 
         return prompt
 
@@ -161,12 +202,13 @@ ANSWER (include citations):"""
     def _generate_ollama(self, prompt: str) -> str:
         """Generate using Ollama API"""
         try:
-            response = self.requests.post(
+            response = self.session.post(
                 f"{self.ollama_base_url}/api/generate",
                 json={
                     "model": self.ollama_model,
                     "prompt": prompt,
                     "stream": False,
+                    "keep_alive": "10m",  # Keep the model loaded between calls
                     "options": {
                         "temperature": self.temperature,
                         "num_predict": self.max_length
@@ -205,5 +247,5 @@ ANSWER (include citations):"""
     def _estimate_confidence(self, answer: str, evidence: List[Dict]) -> float:
         """Estimate confidence in answer"""
         # Simple heuristic: check if answer contains citations
-        has_citation = any(marker in answer for marker in ['Table', 'Section', 'Row'])
+        has_citation = self._CITE_RE.search(answer) is not None
         return 0.8 if has_citation else 0.5
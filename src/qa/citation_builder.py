@@ -2,6 +2,7 @@
 Citation builder for generating precise source citations
 """
 from typing import List, Dict, Any
+from functools import lru_cache
 
 
 class CitationBuilder:
@@ -42,36 +43,39 @@ class CitationBuilder:
             citations.append(citation)
 
         # Remove duplicates while preserving order
-        seen = set()
-        unique_citations = []
-        for cit in citations:
-            if cit not in seen:
-                seen.add(cit)
-                unique_citations.append(cit)
-
-        return unique_citations
+        return list(dict.fromkeys(citations))
 
     def _build_table_citation(self, metadata: Dict[str, Any]) -> str:
         """Build citation for table evidence"""
-        ticker = metadata['ticker']
-        fiscal_year = metadata['fiscal_year']
-        table_id = metadata.get('table_id', 'Unknown')
-        section = metadata.get('section', 'Unknown Section')
-        row_idx = metadata.get('row_idx', '')
+        return _table_citation(
+            metadata['ticker'],
+            metadata['fiscal_year'],
+            metadata.get('table_id', 'Unknown'),
+            metadata.get('section', 'Unknown Section'),
+            metadata.get('row_idx', '')
+        )
+
+    def _build_text_citation(self, metadata: Dict[str, Any]) -> str:
+        """Build citation for text evidence"""
+        return _text_citation(
+            metadata['ticker'],
+            metadata['fiscal_year'],
+            metadata.get('section_title', 'Unknown Section')
+        )
 
-        citation = f"{ticker} {fiscal_year} 10-K, {section}, Table {table_id}"
 
-        if row_idx != '':
-            citation += f", Row {row_idx}"
+@lru_cache(maxsize=65536)
+def _table_citation(ticker: str, fiscal_year: int, table_id: str, section: str, row_idx) -> str:
+    """Format (and cache) a table citation"""
+    citation = f"{ticker} {fiscal_year} 10-K, {section}, Table {table_id}"
 
-        return citation
+    if row_idx != '':
+        citation += f", Row {row_idx}"
 
-    def _build_text_citation(self, metadata: Dict[str, Any]) -> str:
-        """Build citation for text evidence"""
-        ticker = metadata['ticker']
-        fiscal_year = metadata['fiscal_year']
-        section_title = metadata.get('section_title', 'Unknown Section')
+    return citation
 
-        citation = f"{ticker} {fiscal_year} 10-K, {section_title}"
 
-        return citation
+@lru_cache(maxsize=65536)
+def _text_citation(ticker: str, fiscal_year: int, section_title: str) -> str:
+    """Format (and cache) a text citation"""
+    return f"{ticker} {fiscal_year} 10-K, {section_title}"
@@ -18,6 +18,17 @@ class MathVerifier:
         """
         self.tolerance = tolerance
 
+        # Pattern for numbers with an optional unit suffix; the unit must end the
+        # token so '25bps', '10months', '7MB' or 'Rule 10b5-1' are not scaled
+        self._num_re = re.compile(r'(-?\d+\.?\d*)(?:(million|billion|thousand|[MmBb])(?![\w-]))?')
+
+        # Multiplier for each unit suffix
+        self._mult = {
+            'B': 1e9, 'b': 1e9, 'billion': 1e9,
+            'M': 1e6, 'm': 1e6, 'million': 1e6,
+            'thousand': 1e3
+        }
+
     def verify(
         self,
         answer: str,
@@ -100,27 +111,13 @@ class MathVerifier:
         # Handle string input
         text_str = str(text)
 
-        # Pattern for numbers with optional units
-        pattern = r'-?\d+\.?\d*(?:[MBmb]|million|billion|thousand)?'
-
-        matches = re.findall(pattern, text_str)
         numbers = []
+        mult_get = self._mult.get
 
-        for match in matches:
-            # Convert to float, handling unit suffixes
-            num_str = re.sub(r'[MBmb]|million|billion|thousand', '', match)
+        for match in self._num_re.finditer(text_str):
+            # Convert to float and apply the unit multiplier
             try:
-                num = float(num_str)
-
-                # Apply multipliers
-                if 'B' in match or 'billion' in match.lower():
-                    num *= 1e9
-                elif 'M' in match or 'million' in match.lower():
-                    num *= 1e6
-                elif 'thousand' in match.lower():
-                    num *= 1e3
-
-                numbers.append(num)
+                numbers.append(float(match.group(1)) * mult_get(match.group(2), 1.0))
             except ValueError:
                 continue
 
@@ -146,13 +143,10 @@ class MathVerifier:
             return False
 
         # Check if answer matches difference of any two evidence numbers
-        for i in range(len(evidence_nums)):
-            for j in range(i + 1, len(evidence_nums)):
-                diff = abs(evidence_nums[i] - evidence_nums[j])
-                if self._numbers_match(answer_nums[0], diff):
-                    return True
+        ev = np.asarray(evidence_nums, dtype=np.float64)
+        diffs = np.abs(ev[:, None] - ev[None, :])[np.triu_indices(len(ev), k=1)]
 
-        return False
+        return self._matches_any(answer_nums[0], diffs)
 
     def _verify_ratio(self, answer_nums: List[float], evidence_nums: List[float]) -> bool:
         """Verify ratio calculation"""
@@ -160,14 +154,11 @@ class MathVerifier:
             return False
 
         # Check if answer matches ratio of any two evidence numbers
-        for i in range(len(evidence_nums)):
-            for j in range(len(evidence_nums)):
-                if i != j and evidence_nums[j] != 0:
-                    ratio = evidence_nums[i] / evidence_nums[j]
-                    if self._numbers_match(answer_nums[0], ratio):
-                        return True
+        ev = np.asarray(evidence_nums, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = ev[:, None] / ev[None, :]
 
-        return False
+        return self._matches_any(answer_nums[0], ratios[self._pair_mask(ev)])
 
     def _verify_percentage(self, answer_nums: List[float], evidence_nums: List[float]) -> bool:
         """Verify percentage calculation"""
@@ -175,21 +166,34 @@ class MathVerifier:
             return False
 
         # Check if answer matches percentage change
-        for i in range(len(evidence_nums)):
-            for j in range(len(evidence_nums)):
-                if i != j and evidence_nums[j] != 0:
-                    pct_change = ((evidence_nums[i] - evidence_nums[j]) / evidence_nums[j]) * 100
-                    if self._numbers_match(answer_nums[0], pct_change):
-                        return True
+        ev = np.asarray(evidence_nums, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_changes = ((ev[:, None] - ev[None, :]) / ev[None, :]) * 100
+
+        return self._matches_any(answer_nums[0], pct_changes[self._pair_mask(ev)])
+
+    def _pair_mask(self, ev: np.ndarray) -> np.ndarray:
+        """Mask of (i, j) pairs with i != j and a non-zero denominator ev[j]"""
+        mask = np.broadcast_to(ev[None, :] != 0, (len(ev), len(ev))).copy()
+        np.fill_diagonal(mask, False)
+        return mask
+
+    def _matches_any(self, num: float, candidates: np.ndarray) -> bool:
+        """Check if num matches any of the candidates within tolerance"""
+        return bool(self._match_mask(num, candidates).any())
 
-        return False
+    def _match_mask(self, nums, candidates: np.ndarray) -> np.ndarray:
+        """Vectorized _numbers_match over broadcast arrays of numbers"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_err = np.abs((nums - candidates) / candidates)
+        return np.where(candidates == 0, np.abs(nums) < self.tolerance, rel_err < self.tolerance)
 
     def _verify_presence(self, answer_nums: List[float], evidence_nums: List[float]) -> bool:
         """Verify numbers appear in evidence"""
-        for ans_num in answer_nums:
-            if not any(self._numbers_match(ans_num, ev_num) for ev_num in evidence_nums):
-                return False
-        return True
+        # (answers x evidence) match matrix; every answer needs a match
+        ans = np.asarray(answer_nums, dtype=np.float64)[:, None]
+        ev = np.asarray(evidence_nums, dtype=np.float64)[None, :]
+        return bool(self._match_mask(ans, ev).any(axis=1).all())
 
     def _numbers_match(self, num1: float, num2: float) -> bool:
         """Check if two numbers match within tolerance"""
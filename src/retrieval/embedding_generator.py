@@ -1,7 +1,8 @@
 """
 Embedding generator using sentence transformers
 """
-from typing import List, Union
+from typing import List, Union, Tuple
+from functools import lru_cache
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
@@ -14,7 +15,11 @@ class EmbeddingGenerator:
         self,
         model_name: str = "sentence-transformers/all-mpnet-base-v2",
         batch_size: int = 32,
-        device: str = 'cpu'
+        device: str = 'cpu',
+        normalize_embeddings: bool = True,
+        use_fp16: bool = True,
+        backend: str = 'torch',
+        onnx_file_name: str = None
     ):
         """
         Initialize embedding generator
@@ -23,14 +28,42 @@ class EmbeddingGenerator:
             model_name: Name of sentence transformer model
             batch_size: Batch size for encoding
             device: Device to use ('cpu' or 'cuda')
+            normalize_embeddings: L2-normalize embeddings (cosine similarity as inner product)
+            use_fp16: Run inference in FP16 on CUDA devices
+            backend: Inference backend ('torch' or 'onnx'; onnx needs
+                sentence-transformers[onnx] >= 3.2)
+            onnx_file_name: ONNX file within the model repo, e.g.
+                'onnx/model_qint8_avx512_vnni.onnx' for the int8-quantized export
         """
         self.model_name = model_name
         self.batch_size = batch_size
         self.device = device
+        self.normalize_embeddings = normalize_embeddings
 
         print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name, device=device)
-        print(f"Model loaded on {device}")
+        if backend == 'onnx':
+            # ONNX Runtime with graph fusions; exported on first load if the repo has no ONNX file
+            model_kwargs = {'provider': 'CPUExecutionProvider'} if device == 'cpu' else {}
+            if onnx_file_name:
+                model_kwargs['file_name'] = onnx_file_name
+            self.model = SentenceTransformer(
+                model_name,
+                device=device,
+                backend='onnx',
+                model_kwargs=model_kwargs
+            )
+        else:
+            self.model = SentenceTransformer(model_name, device=device)
+
+        # Half precision halves memory traffic on GPU; CPU stays FP32
+        if use_fp16 and backend == 'torch' and device.startswith('cuda'):
+            self.model = self.model.half()
+            print(f"Model loaded on {device} (fp16)")
+        else:
+            print(f"Model loaded on {device}")
+
+        # Per-instance cache of query embeddings, keyed on the query tuple
+        self._encode_queries_cached = lru_cache(maxsize=1024)(self._encode_query_tuple)
 
     def encode(
         self,
@@ -56,9 +89,14 @@ class EmbeddingGenerator:
             texts,
             batch_size=self.batch_size,
             show_progress_bar=show_progress,
-            convert_to_numpy=convert_to_numpy
+            convert_to_numpy=convert_to_numpy,
+            normalize_embeddings=self.normalize_embeddings
         )
 
+        # FP16 models return half-precision arrays; indices expect float32
+        if convert_to_numpy and embeddings.dtype != np.float32:
+            embeddings = embeddings.astype(np.float32)
+
         return embeddings
 
     def encode_queries(
@@ -66,15 +104,21 @@ class EmbeddingGenerator:
         queries: List[str]
     ) -> np.ndarray:
         """
-        Encode queries (alias for encode)
+        Encode queries (alias for encode, with repeated queries cached)
 
         Args:
             queries: List of query strings
 
         Returns:
-            Array of query embeddings
+            Array of query embeddings (read-only; copy before modifying)
         """
-        return self.encode(queries, show_progress=False)
+        return self._encode_queries_cached(tuple(queries))
+
+    def _encode_query_tuple(self, queries: Tuple[str, ...]) -> np.ndarray:
+        """Encode a tuple of queries; results are shared through the cache"""
+        embeddings = self.encode(list(queries), show_progress=False)
+        embeddings.setflags(write=False)
+        return embeddings
 
     def get_embedding_dimension(self) -> int:
         """Get dimension of embeddings"""
@@ -2,10 +2,18 @@
 Hierarchical retriever implementing two-stage retrieval (sections -> content)
 """
 from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 import faiss
 
 
+@lru_cache(maxsize=4096)
+def _tokenize_query(query: str) -> tuple:
+    """Lowercase whitespace tokenization for BM25, cached per query string"""
+    return tuple(query.lower().split())
+
+
 class HierarchicalRetriever:
     """Two-stage hierarchical retrieval system"""
 
@@ -17,7 +25,8 @@ class HierarchicalRetriever:
         section_data: Dict,
         text_data: Dict,
         table_data: Dict,
-        embedding_model
+        embedding_model,
+        hnsw_ef_search: int = 64
     ):
         """
         Initialize hierarchical retriever
@@ -30,6 +39,7 @@ class HierarchicalRetriever:
             text_data: Text chunk content and metadata
             table_data: Table sentence content and metadata
             embedding_model: Sentence transformer model
+            hnsw_ef_search: Search depth for HNSW indices (higher = better recall, slower)
         """
         self.section_index = section_index
         self.text_index = text_index
@@ -41,25 +51,58 @@ class HierarchicalRetriever:
 
         self.embedding_model = embedding_model
 
-    def retrieve_sections(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        # Apply the HNSW search depth to any graph indices
+        for index in (section_index, text_index, table_index):
+            if isinstance(index, faiss.IndexHNSW):
+                index.hnsw.efSearch = hnsw_ef_search
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a query into a (1, D) float32 embedding
+
+        Args:
+            query: User query
+
+        Returns:
+            Query embedding ready for FAISS search
+        """
+        # EmbeddingGenerator caches repeated queries in encode_queries
+        if hasattr(self.embedding_model, 'encode_queries'):
+            query_embedding = self.embedding_model.encode_queries([query])[0]
+        else:
+            query_embedding = self.embedding_model.encode([query])[0]
+
+        # No copy when the embedding is already contiguous float32
+        return np.ascontiguousarray(query_embedding, dtype=np.float32).reshape(1, -1)
+
+    def retrieve_sections(
+        self,
+        query: str,
+        k: int = 5,
+        query_embedding: np.ndarray = None,
+        dense_hits: tuple = None
+    ) -> List[Dict[str, Any]]:
         """
         Stage A: Retrieve relevant sections
 
         Args:
             query: User query
             k: Number of sections to retrieve
+            query_embedding: Precomputed query embedding (encoded if not given)
+            dense_hits: Precomputed (scores, indices) from the section index
 
         Returns:
             List of section results with metadata
         """
-        # Encode query
-        query_embedding = self.embedding_model.encode([query])[0]
+        if dense_hits is None:
+            # Encode query
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
 
-        # Search section index
-        distances, indices = self.section_index.search(
-            query_embedding.reshape(1, -1).astype('float32'),
-            k
-        )
+            # Search section index
+            dense_hits = self._search(self.section_index, query_embedding, k)
+
+        scores, indices = dense_hits
 
         # Compile results
         results = []
@@ -67,7 +110,7 @@ class HierarchicalRetriever:
             results.append({
                 'section_abstract': self.section_data['abstracts'][idx],
                 'metadata': self.section_data['metadata'][idx],
-                'score': 1.0 / (1.0 + distances[0][i])  # Convert distance to similarity
+                'score': scores[0][i]
             })
 
         return results
@@ -93,8 +136,29 @@ class HierarchicalRetriever:
         Returns:
             Dictionary with retrieved content and metadata
         """
+        # Encode query once for both stages
+        query_embedding = self.encode_query(query)
+
+        # Stage B searches the table index only if there are table sentences to return
+        use_tables = route_info['is_table_centric'] and bool(self.table_data.get('sentences'))
+        content_index = self.table_index if use_tables else self.text_index
+
+        # Run the section search in a worker while the content search runs here
+        # (FAISS releases the GIL); the worker is shut down when both are done
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            section_future = executor.submit(
+                self._search, self.section_index, query_embedding, top_k_sections
+            )
+            content_hits = self._search(content_index, query_embedding, top_k_content * 2)
+            section_hits = section_future.result()
+
         # Stage A: Retrieve relevant sections
-        sections = self.retrieve_sections(query, k=top_k_sections)
+        sections = self.retrieve_sections(
+            query,
+            k=top_k_sections,
+            query_embedding=query_embedding,
+            dense_hits=section_hits
+        )
 
         # Get section identifiers for filtering
         section_identifiers = [
@@ -103,21 +167,35 @@ class HierarchicalRetriever:
         ]
 
         # Stage B: Retrieve content within selected sections
-        if route_info['is_table_centric']:
+        # (content is carried as id/score arrays and materialized at the end;
+        # without table sentences, table-centric queries fall back to text)
+        if use_tables:
             # Prioritize table retrieval
-            content = self._retrieve_tables(
+            content_ids, content_scores = self._retrieve_tables(
                 query,
                 section_identifiers,
                 k=top_k_content,
-                use_hybrid=use_hybrid
+                use_hybrid=use_hybrid,
+                query_embedding=query_embedding,
+                dense_hits=content_hits
+            )
+            content = self._materialize(
+                content_ids, content_scores,
+                self.table_data['sentences'], self.table_data['metadata']
             )
         else:
             # Retrieve text content
-            content = self._retrieve_text(
+            content_ids, content_scores = self._retrieve_text(
                 query,
                 section_identifiers,
                 k=top_k_content,
-                use_hybrid=use_hybrid
+                use_hybrid=use_hybrid,
+                query_embedding=query_embedding,
+                dense_hits=content_hits
+            )
+            content = self._materialize(
+                content_ids, content_scores,
+                self.text_data['chunks'], self.text_data['metadata']
             )
 
         return {
@@ -130,129 +208,139 @@ class HierarchicalRetriever:
         query: str,
         section_filter: List,
         k: int,
-        use_hybrid: bool
-    ) -> List[Dict[str, Any]]:
-        """Retrieve table sentences"""
-        # Check if table sentences exist
-        if not self.table_data.get('sentences') or len(self.table_data['sentences']) == 0:
-            # Fall back to text retrieval if no table data
-            return self._retrieve_text(query, section_filter, k, use_hybrid)
-
-        # Encode query
-        query_embedding = self.embedding_model.encode([query])[0]
-
-        # Dense search
-        distances, indices = self.table_index.search(
-            query_embedding.reshape(1, -1).astype('float32'),
-            k * 2  # Retrieve more for filtering
-        )
-
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx >= len(self.table_data['sentences']):
-                continue
-
-            metadata = self.table_data['metadata'][idx]
-
-            # Filter by section (if applicable)
-            # Simplified - actual implementation would check section match
+        use_hybrid: bool,
+        query_embedding: np.ndarray = None,
+        dense_hits: tuple = None
+    ) -> tuple:
+        """Retrieve table sentences as (sentence ids, scores) arrays, best first"""
+        # No table sentences: return nothing and let the caller fall back to text,
+        # since text chunk ids could not be told apart from table sentence ids
+        if not self.table_data.get('sentences'):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if dense_hits is None:
+            # Encode query
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+
+            # Dense search
+            dense_hits = self._search(
+                self.table_index,
+                query_embedding,
+                k * 2  # Retrieve more for filtering
+            )
 
-            results.append({
-                'content': self.table_data['sentences'][idx],
-                'metadata': metadata,
-                'score': 1.0 / (1.0 + distances[0][i])
-            })
+        # Filter by section (if applicable)
+        # Simplified - actual implementation would check section match
+        ids, scores = self._valid_hits(dense_hits, len(self.table_data['sentences']))
 
         # Optionally add BM25 results
         if use_hybrid and 'bm25' in self.table_data and self.table_data['bm25'] is not None:
-            bm25_results = self._bm25_search(
-                query,
-                self.table_data['bm25'],
-                self.table_data['sentences'],
-                self.table_data['metadata'],
-                k=k
-            )
-            results = self._merge_results(results, bm25_results)
+            bm25_ids, bm25_scores = self._bm25_search(query, self.table_data['bm25'], k=k)
+            ids, scores = self._merge_results(ids, scores, bm25_ids, bm25_scores)
 
-        return results[:k]
+        return ids[:k], scores[:k]
 
     def _retrieve_text(
         self,
         query: str,
         section_filter: List,
         k: int,
-        use_hybrid: bool
-    ) -> List[Dict[str, Any]]:
-        """Retrieve text chunks"""
+        use_hybrid: bool,
+        query_embedding: np.ndarray = None,
+        dense_hits: tuple = None
+    ) -> tuple:
+        """Retrieve text chunks as (chunk ids, scores) arrays, best first"""
         # Similar to _retrieve_tables but for text
-        query_embedding = self.embedding_model.encode([query])[0]
+        if dense_hits is None:
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
 
-        distances, indices = self.text_index.search(
-            query_embedding.reshape(1, -1).astype('float32'),
-            k * 2
-        )
+            dense_hits = self._search(self.text_index, query_embedding, k * 2)
 
-        results = []
-        for i, idx in enumerate(indices[0]):
-            results.append({
-                'content': self.text_data['chunks'][idx],
-                'metadata': self.text_data['metadata'][idx],
-                'score': 1.0 / (1.0 + distances[0][i])
-            })
+        ids, scores = self._valid_hits(dense_hits, len(self.text_data['chunks']))
 
         if use_hybrid and 'bm25' in self.text_data:
-            bm25_results = self._bm25_search(
-                query,
-                self.text_data['bm25'],
-                self.text_data['chunks'],
-                self.text_data['metadata'],
-                k=k
-            )
-            results = self._merge_results(results, bm25_results)
+            bm25_ids, bm25_scores = self._bm25_search(query, self.text_data['bm25'], k=k)
+            ids, scores = self._merge_results(ids, scores, bm25_ids, bm25_scores)
 
-        return results[:k]
+        return ids[:k], scores[:k]
 
-    def _bm25_search(self, query: str, bm25_index, documents: List, metadata: List, k: int) -> List[Dict]:
-        """BM25 keyword search"""
-        query_tokens = query.lower().split()
-        scores = bm25_index.get_scores(query_tokens)
-
-        # Get top k
-        top_indices = np.argsort(scores)[::-1][:k]
+    def _valid_hits(self, dense_hits: tuple, num_docs: int) -> tuple:
+        """Flatten FAISS (scores, indices) for one query, dropping missing (-1) or stale ids"""
+        scores, indices = dense_hits
+        ids, scores = indices[0], scores[0]
+        valid = (ids >= 0) & (ids < num_docs)
+        return ids[valid], scores[valid]
 
-        results = []
-        for idx in top_indices:
-            results.append({
+    def _materialize(
+        self,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        documents: List,
+        metadata: List
+    ) -> List[Dict[str, Any]]:
+        """Build result dicts from id/score arrays"""
+        return [
+            {
                 'content': documents[idx],
                 'metadata': metadata[idx],
-                'score': scores[idx]
-            })
+                'score': score
+            }
+            for idx, score in zip(ids.tolist(), scores.tolist())
+        ]
 
-        return results
+    def _search(self, index: faiss.Index, query_embedding: np.ndarray, k: int):
+        """Search a FAISS index and return (similarity scores, indices)"""
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            # Inner-product indices hold normalized vectors: score is cosine similarity
+            query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
+            return index.search(query_embedding, k)
 
-    def _merge_results(self, dense_results: List, bm25_results: List, alpha: float = 0.7) -> List[Dict]:
-        """Merge dense and BM25 results with weighted fusion"""
-        # Simplified reciprocal rank fusion
-        merged = {}
+        # L2 indices: convert distance to similarity
+        distances, indices = index.search(query_embedding, k)
+        return 1.0 / (1.0 + distances), indices
 
-        for i, result in enumerate(dense_results):
-            key = result['content'][:50]  # Use content prefix as key
-            merged[key] = {
-                **result,
-                'score': alpha * result['score']
-            }
+    def _bm25_search(self, query: str, bm25_index, k: int) -> tuple:
+        """BM25 keyword search returning (document ids, scores) arrays, best first"""
+        query_tokens = _tokenize_query(query)
+        scores = bm25_index.get_scores(query_tokens)
 
-        for i, result in enumerate(bm25_results):
-            key = result['content'][:50]
-            if key in merged:
-                merged[key]['score'] += (1 - alpha) * result['score']
-            else:
-                merged[key] = {
-                    **result,
-                    'score': (1 - alpha) * result['score']
-                }
+        # Get top k: partial partition in O(N), then sort only the k winners
+        if len(scores) <= k:
+            top_indices = np.argsort(scores)[::-1][:k]
+        else:
+            top_indices = np.argpartition(scores, -k)[-k:]
+            top_indices = top_indices[np.argsort(scores[top_indices])[::-1]]
 
-        # Sort by merged score
-        sorted_results = sorted(merged.values(), key=lambda x: x['score'], reverse=True)
+        return top_indices, scores[top_indices]
 
-        return sorted_results
+    def _merge_results(
+        self,
+        dense_ids: np.ndarray,
+        dense_scores: np.ndarray,
+        bm25_ids: np.ndarray,
+        bm25_scores: np.ndarray,
+        alpha: float = 0.7
+    ) -> tuple:
+        """Merge dense and BM25 results with weighted fusion, keyed by document id"""
+        # Candidates in first-seen order: dense hits, then BM25-only hits
+        all_ids = np.concatenate((dense_ids, bm25_ids)).astype(np.int64, copy=False)
+        _, first_seen = np.unique(all_ids, return_index=True)
+        candidates = all_ids[np.sort(first_seen)]
+
+        # Position of each hit among the candidates
+        by_id = np.argsort(candidates)
+        sorted_candidates = candidates[by_id]
+        dense_pos = by_id[np.searchsorted(sorted_candidates, dense_ids)]
+        bm25_pos = by_id[np.searchsorted(sorted_candidates, bm25_ids)]
+
+        # Weighted sum of dense and BM25 scores
+        merged = np.zeros(len(candidates))
+        np.add.at(merged, dense_pos, alpha * np.asarray(dense_scores, dtype=np.float64))
+        np.add.at(merged, bm25_pos, (1 - alpha) * np.asarray(bm25_scores, dtype=np.float64))
+
+        # Sort by merged score (stable, so ties keep first-seen order)
+        order = np.argsort(-merged, kind='stable')
+
+        return candidates[order], merged[order]
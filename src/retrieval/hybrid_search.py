@@ -45,24 +45,65 @@ class HybridSearcher:
         Returns:
             Fused and ranked results
         """
-        # Use reciprocal rank fusion
-        scores = {}
-
-        # Process dense results
-        for rank, result in enumerate(dense_results):
-            doc_id = result.get('id', str(result))
-            scores[doc_id] = self.dense_weight / (rank + 1)
-
-        # Process BM25 results
-        for rank, result in enumerate(bm25_results):
-            doc_id = result.get('id', str(result))
-            if doc_id in scores:
-                scores[doc_id] += self.bm25_weight / (rank + 1)
-            else:
-                scores[doc_id] = self.bm25_weight / (rank + 1)
-
-        # Sort by combined score
-        sorted_ids = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-
-        # Return top k
-        return sorted_ids[:top_k]
+        # Map each document to a dense integer id in first-seen order
+        doc_keys = {}
+        dense_ids = np.fromiter(
+            (doc_keys.setdefault(self._doc_key(r), len(doc_keys)) for r in dense_results),
+            dtype=np.int64, count=len(dense_results)
+        )
+        bm25_ids = np.fromiter(
+            (doc_keys.setdefault(self._doc_key(r), len(doc_keys)) for r in bm25_results),
+            dtype=np.int64, count=len(bm25_results)
+        )
+
+        top_ids, top_scores = self.fuse_ids(dense_ids, bm25_ids, len(doc_keys), top_k)
+
+        keys = list(doc_keys)
+        return [(keys[i], score) for i, score in zip(top_ids.tolist(), top_scores.tolist())]
+
+    def fuse_ids(
+        self,
+        dense_ids: np.ndarray,
+        bm25_ids: np.ndarray,
+        n_docs: int,
+        top_k: int = 10
+    ) -> tuple:
+        """
+        Fuse ranked lists of integer document ids with reciprocal rank fusion
+
+        A document repeated within one list (e.g. returned by several
+        sub-indices) counts once per list, at its best (first) rank.
+
+        Args:
+            dense_ids: Document ids from dense retrieval (ordered by rank)
+            bm25_ids: Document ids from BM25 (ordered by rank)
+            n_docs: Size of the document id space
+            top_k: Number of results to return
+
+        Returns:
+            Tuple of (document ids, fused scores) for the top k, best first
+        """
+        dense_ids = np.asarray(dense_ids, dtype=np.int64)
+        bm25_ids = np.asarray(bm25_ids, dtype=np.int64)
+
+        # Accumulate weighted reciprocal ranks per document, first rank per list only
+        scores = np.zeros(n_docs)
+        for ids, weight in ((dense_ids, self.dense_weight), (bm25_ids, self.bm25_weight)):
+            unique_ids, first_rank = np.unique(ids, return_index=True)
+            scores += np.bincount(unique_ids, weights=weight / (first_rank + 1), minlength=n_docs)
+
+        # Only documents that appeared in either list are candidates
+        candidates = np.union1d(dense_ids, bm25_ids)
+
+        # Highest score first, ties in id order (a full stable sort, so ties at
+        # the top_k boundary are cut in id order too)
+        order = np.argsort(-scores[candidates], kind='stable')[:top_k]
+        top_ids = candidates[order]
+
+        return top_ids, scores[top_ids]
+
+    def _doc_key(self, result: Dict[str, Any]):
+        """Identify a result by its id, falling back to its content"""
+        if 'id' in result:
+            return result['id']
+        return result.get('content', str(result))
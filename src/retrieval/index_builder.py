@@ -5,10 +5,69 @@ from typing import List, Dict, Any
 import numpy as np
 import faiss
 from rank_bm25 import BM25Okapi
+from scipy import sparse
 import pickle
 from pathlib import Path
 
 
+class SparseBM25(BM25Okapi):
+    """
+    BM25Okapi with precomputed term weights over a token-id vocabulary
+
+    Every (document, token) BM25 weight is computed once at build time into a
+    sparse (documents x vocab) matrix, so scoring a query is a single sparse
+    matrix-vector product instead of a dict lookup per document per token.
+    """
+
+    def __init__(self, corpus: List[List[str]], **kwargs):
+        super().__init__(corpus, **kwargs)
+
+        # Token -> column id, in the same order as the idf table
+        self.vocab = {token: i for i, token in enumerate(self.idf)}
+        idf = np.fromiter(self.idf.values(), dtype=np.float64, count=len(self.idf))
+
+        rows, cols, freqs = [], [], []
+        for doc_id, doc_freqs in enumerate(self.doc_freqs):
+            rows.extend([doc_id] * len(doc_freqs))
+            cols.extend(self.vocab[token] for token in doc_freqs)
+            freqs.extend(doc_freqs.values())
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        freqs = np.asarray(freqs, dtype=np.float64)
+        doc_len = np.asarray(self.doc_len, dtype=np.float64)[rows]
+
+        weights = idf[cols] * (freqs * (self.k1 + 1) /
+                               (freqs + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)))
+
+        # Column-major so the query's token columns can be sliced cheaply
+        self.term_weights = sparse.csc_matrix(
+            (weights, (rows, cols)),
+            shape=(self.corpus_size, len(self.vocab))
+        )
+
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        """
+        Score every document against a tokenized query
+
+        Args:
+            query: Query tokens
+
+        Returns:
+            Array of BM25 scores, one per document
+        """
+        vocab_get = self.vocab.get
+        token_ids = [token_id for token_id in map(vocab_get, query) if token_id is not None]
+
+        if not token_ids:
+            return np.zeros(self.corpus_size)
+
+        # Repeated query tokens count once per occurrence, as in BM25Okapi
+        token_ids, counts = np.unique(token_ids, return_counts=True)
+
+        return self.term_weights[:, token_ids] @ counts.astype(np.float64)
+
+
 class IndexBuilder:
     """Build and manage search indices"""
 
@@ -18,40 +77,95 @@ class IndexBuilder:
     def build_faiss_index(
         self,
         embeddings: np.ndarray,
-        index_type: str = "flat"
+        index_type: str = "auto"
     ) -> faiss.Index:
         """
         Build FAISS index from embeddings
 
         Args:
             embeddings: Array of embeddings (N x D)
-            index_type: Type of index ('flat', 'ivf', 'hnsw')
+            index_type: Type of index ('auto', 'flat', 'flat_fp16', 'ivf',
+                'hnsw', 'ivfpq'). 'auto' picks by corpus size: flat below
+                1k vectors, hnsw below 100k, ivfpq above.
 
         Returns:
             FAISS index
         """
-        dimension = embeddings.shape[1]
+        num_vectors, dimension = embeddings.shape
+
+        if index_type == "auto":
+            index_type = self._select_index_type(num_vectors)
+
+        if index_type in ("flat", "flat_fp16", "hnsw", "ivfpq"):
+            # Cosine similarity as inner product over L2-normalized vectors
+            embeddings = np.array(embeddings, dtype='float32', order='C')
+            faiss.normalize_L2(embeddings)
+        else:
+            # Convert once; FAISS needs contiguous float32
+            embeddings = np.ascontiguousarray(embeddings, dtype='float32')
 
         if index_type == "flat":
-            # Simple flat L2 index
-            index = faiss.IndexFlatL2(dimension)
+            # Exact inner-product index
+            index = faiss.IndexFlatIP(dimension)
+        elif index_type == "flat_fp16":
+            # Exact inner-product search over vectors stored as FP16
+            index = faiss.IndexScalarQuantizer(
+                dimension,
+                faiss.ScalarQuantizer.QT_fp16,
+                faiss.METRIC_INNER_PRODUCT
+            )
         elif index_type == "ivf":
             # IVF index for larger datasets
             quantizer = faiss.IndexFlatL2(dimension)
             nlist = min(100, embeddings.shape[0] // 10)  # Number of clusters
             index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
-            index.train(embeddings.astype('float32'))
+            index.train(self._training_sample(embeddings, nlist))
         elif index_type == "hnsw":
-            # HNSW index for fast approximate search
-            index = faiss.IndexHNSWFlat(dimension, 32)
+            # HNSW graph index for fast approximate search
+            index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+        elif index_type == "ivfpq":
+            # IVF with product quantization: compressed codes for very large corpora
+            nlist = min(4096, int(4 * np.sqrt(num_vectors)))  # Number of clusters
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(
+                quantizer, dimension, nlist, self._pq_subquantizers(dimension), 8,
+                faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(self._training_sample(embeddings, nlist))
+            index.nprobe = 16
         else:
             raise ValueError(f"Unknown index type: {index_type}")
 
         # Add vectors to index
-        index.add(embeddings.astype('float32'))
+        index.add(embeddings)
 
         return index
 
+    def _select_index_type(self, num_vectors: int) -> str:
+        """Pick an index type from the number of vectors"""
+        if num_vectors < 1000:
+            return "flat"
+        elif num_vectors < 100_000:
+            return "hnsw"
+        return "ivfpq"
+
+    def _training_sample(self, embeddings: np.ndarray, nlist: int) -> np.ndarray:
+        """Random subset for k-means training (~39 points per centroid, at least 10k)"""
+        num_vectors = embeddings.shape[0]
+        n_train = min(num_vectors, max(nlist * 39, 10_000))
+        if n_train == num_vectors:
+            return embeddings
+
+        rng = np.random.default_rng(0)
+        sample_ids = np.sort(rng.choice(num_vectors, n_train, replace=False))
+        return embeddings[sample_ids]
+
+    def _pq_subquantizers(self, dimension: int, max_m: int = 48) -> int:
+        """Largest number of PQ sub-quantizers (<= max_m) that divides dimension"""
+        return max(m for m in range(1, max_m + 1) if dimension % m == 0)
+
     def build_bm25_index(
         self,
         documents: List[str],
@@ -65,14 +179,14 @@ class IndexBuilder:
             tokenizer: Optional tokenizer function
 
         Returns:
-            BM25Okapi index
+            SparseBM25 index
         """
         if tokenizer is None:
             # Simple whitespace tokenizer
             tokenizer = lambda x: x.lower().split()
 
         tokenized_docs = [tokenizer(doc) for doc in documents]
-        bm25 = BM25Okapi(tokenized_docs)
+        bm25 = SparseBM25(tokenized_docs)
 
         return bm25
 
@@ -24,6 +24,21 @@ class QueryRouter:
             'ratio', 'percentage', 'change', 'growth', 'increase', 'decrease'
         ]
 
+        # Each keyword set as one compiled alternation, scanned in a single pass.
+        # The lookahead reports the longest keyword starting at every position;
+        # shorter keywords starting there are its prefixes and are added back
+        # from _table_prefixes, so all keywords are found, as with per-keyword
+        # substring checks.
+        self._table_re = self._keyword_pattern(self.table_keywords)
+        self._math_re = self._keyword_pattern(self.math_keywords)
+        self._table_prefixes = {
+            keyword: {other for other in self.table_keywords if keyword.startswith(other)}
+            for keyword in self.table_keywords
+        }
+
+        # Single Aho-Corasick automaton over both sets, if pyahocorasick is installed
+        self._automaton = self._build_automaton()
+
     def route(self, query: str) -> Dict[str, Any]:
         """
         Classify query and determine routing
@@ -36,11 +51,11 @@ class QueryRouter:
         """
         query_lower = query.lower()
 
-        # Detect table-centric query
-        is_table_centric = self._is_table_centric(query_lower)
+        # Match both keyword sets in one scan
+        table_hits, requires_math = self._match_keywords(query_lower)
 
-        # Detect math requirement
-        requires_math = self._requires_math(query_lower)
+        # Detect table-centric query
+        is_table_centric = len(table_hits) >= 2
 
         # Determine query type
         if is_table_centric and requires_math:
@@ -64,10 +79,54 @@ class QueryRouter:
 
     def _is_table_centric(self, query: str) -> bool:
         """Check if query is table-centric"""
-        # Count table-related keywords
-        keyword_count = sum(1 for kw in self.table_keywords if kw in query)
+        # Count distinct table-related keywords
+        keyword_count = len(self._match_keywords(query)[0])
         return keyword_count >= 2
 
     def _requires_math(self, query: str) -> bool:
         """Check if query requires mathematical operations"""
-        return any(kw in query for kw in self.math_keywords)
+        return self._match_keywords(query)[1]
+
+    def _match_keywords(self, query: str) -> tuple:
+        """
+        Find keywords in a lowercased query
+
+        Returns:
+            Tuple of (set of table keywords found, whether any math keyword was found)
+        """
+        if self._automaton is None:
+            longest = set(self._table_re.findall(query))
+            table_hits = set().union(*(self._table_prefixes[keyword] for keyword in longest))
+            return table_hits, self._math_re.search(query) is not None
+
+        table_hits = set()
+        requires_math = False
+        for _, (keyword, is_table, is_math) in self._automaton.iter(query):
+            if is_table:
+                table_hits.add(keyword)
+            requires_math = requires_math or is_math
+
+        return table_hits, requires_math
+
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton over all keywords, or None if unavailable"""
+        try:
+            import ahocorasick
+        except ImportError:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for keyword in set(self.table_keywords) | set(self.math_keywords):
+            automaton.add_word(
+                keyword,
+                (keyword, keyword in self.table_keywords, keyword in self.math_keywords)
+            )
+        automaton.make_automaton()
+
+        return automaton
+
+    def _keyword_pattern(self, keywords) -> re.Pattern:
+        """Compile keywords into a single substring-matching alternation"""
+        # Longest first so a keyword is never shadowed by a shorter prefix
+        alternation = '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+        return re.compile(f'(?=({alternation}))')
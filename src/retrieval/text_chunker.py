@@ -2,7 +2,14 @@
 Text chunker for splitting documents into searchable chunks
 """
 from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import os
 import re
+import numpy as np
+
+# Code points of sentence-ending punctuation
+_SENT_END_CHARS = (ord('.'), ord('?'), ord('!'))
 
 
 class TextChunker:
@@ -41,76 +48,130 @@ class TextChunker:
         Returns:
             List of chunk dictionaries with text and metadata
         """
+        columns = self.chunk_text_columns(text)
+
+        chunks = []
+        for chunk_id, (chunk_text, start_idx, end_idx) in enumerate(zip(
+            columns['texts'],
+            columns['start_word_idx'].tolist(),
+            columns['end_word_idx'].tolist()
+        )):
+            # Create chunk object
+            chunk = {
+                'text': chunk_text,
+                'chunk_id': chunk_id,
+                'start_word_idx': start_idx,
+                'end_word_idx': end_idx,
+                'metadata': metadata if metadata else {}
+            }
+
+            chunks.append(chunk)
+
+        return chunks
+
+    def chunk_text_columns(
+        self,
+        text: str,
+        metadata: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Chunk text into column arrays instead of one dict per chunk
+
+        Args:
+            text: Input text to chunk
+            metadata: Metadata shared by all chunks
+
+        Returns:
+            Dictionary with 'texts' (chunk strings), 'start_word_idx' and
+            'end_word_idx' (int32 arrays) and a single 'metadata' dict
+        """
+        columns = {
+            'texts': [],
+            'start_word_idx': np.zeros(0, dtype=np.int32),
+            'end_word_idx': np.zeros(0, dtype=np.int32),
+            'metadata': metadata if metadata else {}
+        }
+
         if not text or len(text.strip()) == 0:
-            return []
+            return columns
 
         # Simple word-based chunking (approximates tokens)
         words = text.split()
-        chunks = []
+        num_words = len(words)
 
-        start_idx = 0
-        chunk_id = 0
+        # Chunks are slices of the single-space-joined text, located by word offsets
+        joined = ' '.join(words)
+        word_lens = np.fromiter(map(len, words), dtype=np.int64, count=num_words)
+        word_starts = np.zeros(num_words, dtype=np.int64)
+        np.cumsum(word_lens[:-1] + 1, out=word_starts[1:])
+        word_ends = word_starts + word_lens
 
-        while start_idx < len(words):
-            # Get chunk of words
-            end_idx = min(start_idx + self.chunk_size, len(words))
-            chunk_words = words[start_idx:end_idx]
+        # Positions of every sentence end, found in one scan of the text
+        if self.respect_sentence_boundaries:
+            code_points = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+            is_sent_end = code_points == _SENT_END_CHARS[0]
+            for char in _SENT_END_CHARS[1:]:
+                is_sent_end |= code_points == char
+            sent_ends = np.flatnonzero(is_sent_end)
 
-            # If respecting sentence boundaries, try to end at sentence
-            if self.respect_sentence_boundaries and end_idx < len(words):
-                chunk_text = ' '.join(chunk_words)
-
-                # Find last sentence boundary
-                last_period = chunk_text.rfind('.')
-                last_question = chunk_text.rfind('?')
-                last_exclamation = chunk_text.rfind('!')
+        # Word range of every chunk
+        start_idxs = np.arange(0, num_words, self.chunk_size - self.chunk_overlap, dtype=np.int32)
+        end_idxs = np.minimum(start_idxs + self.chunk_size, num_words).astype(np.int32)
 
-                last_boundary = max(last_period, last_question, last_exclamation)
+        texts = columns['texts']
 
-                if last_boundary > len(chunk_text) * 0.5:  # At least 50% through
-                    # Adjust to end at sentence
-                    chunk_text = chunk_text[:last_boundary + 1]
-                    chunk_words = chunk_text.split()
+        for i, (start_idx, end_idx) in enumerate(zip(start_idxs.tolist(), end_idxs.tolist())):
+            char_start = int(word_starts[start_idx])
+            char_end = int(word_ends[end_idx - 1])
 
-            chunk_text = ' '.join(chunk_words)
+            # If respecting sentence boundaries, try to end at sentence
+            if self.respect_sentence_boundaries and end_idx < num_words:
+                # Find last sentence boundary before the chunk end
+                pos = int(sent_ends.searchsorted(char_end)) - 1
+                last_boundary = int(sent_ends[pos]) - char_start if pos >= 0 else -1
 
-            # Create chunk object
-            chunk = {
-                'text': chunk_text,
-                'chunk_id': chunk_id,
-                'start_word_idx': start_idx,
-                'end_word_idx': start_idx + len(chunk_words),
-                'metadata': metadata if metadata else {}
-            }
+                if last_boundary > (char_end - char_start) * 0.5:  # At least 50% through
+                    # Adjust to end at sentence
+                    char_end = char_start + last_boundary + 1
+                    end_idxs[i] = word_starts.searchsorted(char_end - 1, side='right')
 
-            chunks.append(chunk)
+            texts.append(joined[char_start:char_end])
 
-            # Move forward with overlap
-            start_idx += self.chunk_size - self.chunk_overlap
-            chunk_id += 1
+        columns['start_word_idx'] = start_idxs
+        columns['end_word_idx'] = end_idxs
 
-        return chunks
+        return columns
 
     def chunk_documents(
         self,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        n_jobs: int = None
     ) -> List[Dict[str, Any]]:
         """
         Chunk multiple documents
 
         Args:
             documents: List of document dictionaries with 'text' and 'metadata'
+            n_jobs: Number of worker processes (None = all CPU cores, 1 = serial)
 
         Returns:
             List of all chunks across documents
         """
-        all_chunks = []
+        if n_jobs is None:
+            n_jobs = os.cpu_count() or 1
+
+        if n_jobs <= 1 or len(documents) <= 1:
+            chunk_lists = map(self._chunk_document, documents)
+            return list(chain.from_iterable(chunk_lists))
 
-        for doc in documents:
-            text = doc.get('text', '')
-            metadata = doc.get('metadata', {})
+        # Documents are independent, so chunk them in separate processes
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            chunk_lists = executor.map(self._chunk_document, documents, chunksize=32)
+            return list(chain.from_iterable(chunk_lists))
 
-            chunks = self.chunk_text(text, metadata)
-            all_chunks.extend(chunks)
+    def _chunk_document(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Chunk a single document dictionary"""
+        text = doc.get('text', '')
+        metadata = doc.get('metadata', {})
 
-        return all_chunks
+        return self.chunk_text(text, metadata)
@@ -16,9 +16,12 @@ PARSED_DATA_DIR = DATA_DIR / 'parsed'
 INDICES_DIR = PROJECT_ROOT / 'indices'
 MODEL_DIR = PROJECT_ROOT / 'models'
 
-# Create directories if they don't exist
-for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, PARSED_DATA_DIR, INDICES_DIR, MODEL_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+
+def ensure_dirs():
+    """Create data, index and model directories if they don't exist (call once at startup)"""
+    for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, PARSED_DATA_DIR, INDICES_DIR, MODEL_DIR]:
+        directory.mkdir(parents=True, exist_ok=True)
+
 
 # API Configuration
 SEC_API_BASE_URL = "https://data.sec.gov"
@@ -3,35 +3,105 @@ SEC EDGAR API interface for downloading 10-K filings and XBRL data
 """
 import os
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from urllib.parse import unquote_plus
+import lxml.html
+from lxml import etree
 import re
 
+# Inline XBRL viewer URLs and their 'doc' query parameter
+_VIEWER_RE = re.compile(r'ix(?:\?doc=|viewer)')
+_DOC_PARAM_RE = re.compile(r'[?&]doc=([^&#]+)')
+
+_SEC_BASE = 'https://www.sec.gov'
+_ARCHIVES_BASE = _SEC_BASE + '/Archives/edgar/data'
+_SUBMISSIONS_BASE = 'https://data.sec.gov/submissions'
+
+
+class _RateLimiter:
+    """Thread-safe token bucket shared by all requests of a downloader"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            burst: Bucket capacity (requests allowed back to back)
+        """
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Take a token, sleeping until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            # Tokens may go negative: each waiter reserves its slot in the queue
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if delay > 0:
+            time.sleep(delay)
+
 
 class SECDownloader:
     """Download 10-K filings and XBRL data from SEC EDGAR"""
 
-    def __init__(self, user_agent: str, data_dir: Path):
+    def __init__(
+        self,
+        user_agent: str,
+        data_dir: Path,
+        max_workers: int = 10,
+        requests_per_second: float = 10.0,
+        max_retries: int = 5,
+        cache_expire_after: Optional[int] = 86400
+    ):
         """
         Initialize SEC downloader
 
         Args:
             user_agent: User agent string (must include email per SEC policy)
             data_dir: Directory to save downloaded files
+            max_workers: Number of filings downloaded concurrently
+            requests_per_second: Request rate cap shared by all workers (SEC allows 10/s)
+            max_retries: Retries with exponential backoff on HTTP 429
+            cache_expire_after: Seconds to cache EDGAR index pages on disk
+                (needs requests-cache; None disables caching)
         """
         self.user_agent = user_agent
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
-        self.session = requests.Session()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+
+        # Company directories already created by this downloader
+        self._created_dirs = set()
+
+        # Shared rate limiter for every request made through _get
+        self._rate_limit = _RateLimiter(requests_per_second)
+
+        self.session = self._create_session(cache_expire_after)
+        # One pooled connection per worker
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         # Use proper browser headers to avoid being blocked
         # Source - https://stackoverflow.com/a (Posted by Sergey K, Retrieved 2025-12-02, License - CC BY-SA 4.0)
         self.session.headers.update({
             'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'accept-language': 'en-US,en;q=0.9',
-            'cache-control': 'no-cache',
             'sec-fetch-dest': 'document',
             'sec-fetch-mode': 'navigate',
             'sec-fetch-site': 'none',
@@ -39,6 +109,10 @@ class SECDownloader:
             'upgrade-insecure-requests': '1',
             'user-agent': user_agent,
         })
+        # requests-cache treats 'no-cache' as a forced refresh and would never read
+        # the cache, so only uncached sessions send it on every request
+        if not hasattr(self.session, 'cache'):
+            self.session.headers['cache-control'] = 'no-cache'
 
     def download_10k(
         self,
@@ -47,7 +121,8 @@ class SECDownloader:
         start_year: int,
         end_year: int,
         prefer_html: bool = True,
-        max_filings: Optional[int] = None
+        max_filings: Optional[int] = None,
+        max_workers: Optional[int] = None
     ) -> List[Dict]:
         """
         Download 10-K filings for a company
@@ -59,80 +134,75 @@ class SECDownloader:
             end_year: Ending fiscal year
             prefer_html: Prefer HTML format over PDF
             max_filings: Maximum number of filings to download
+            max_workers: Number of filings downloaded at once (defaults to max_workers)
 
         Returns:
             List of filing metadata dictionaries
         """
         filings = []
 
-        # Search for 10-K filings
-        search_url = f"https://www.sec.gov/cgi-bin/browse-edgar"
-        params = {
-            'action': 'getcompany',
-            'CIK': cik,
-            'type': '10-K',
-            'dateb': f'{end_year}1231',
-            'owner': 'exclude',
-            'count': 100
-        }
-
         try:
-            response = self.session.get(search_url, params=params)
-            response.raise_for_status()
-
-            # Parse filing links
-            soup = BeautifulSoup(response.content, 'html.parser')
-            filing_table = soup.find('table', {'class': 'tableFile2'})
-
-            if not filing_table:
-                return filings
-
-            rows = filing_table.find_all('tr')[1:]  # Skip header
-
-            for row in rows:
-                if max_filings and len(filings) >= max_filings:
-                    break
-
-                cols = row.find_all('td')
-                if len(cols) < 4:
+            # Filing history from the JSON submissions API
+            tasks = []
+            for filing in self._list_filings(cik, start_year):
+                if filing['form'] != '10-K':
                     continue
 
-                filing_type = cols[0].text.strip()
-                if filing_type != '10-K':
-                    continue
-
-                filing_date = cols[3].text.strip()
-                filing_year = int(filing_date.split('-')[0])
+                filing_year = int(filing['filingDate'][:4])
 
                 if filing_year < start_year or filing_year > end_year:
                     continue
 
-                # Get document link
-                doc_link = cols[1].find('a', {'id': 'documentsbutton'})
-                if not doc_link:
-                    continue
-
-                documents_url = f"https://www.sec.gov{doc_link['href']}"
-
-                # Download filing
-                filing_info = self._download_filing(
-                    documents_url,
-                    ticker,
-                    filing_year,
-                    prefer_html
-                )
+                tasks.append((cik, filing, ticker, filing_year, prefer_html))
 
-                if filing_info:
-                    filings.append(filing_info)
+            # Download in waves no larger than the filings still needed, keeping index order
+            with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+                while tasks and not (max_filings and len(filings) >= max_filings):
+                    wave_size = max_filings - len(filings) if max_filings else len(tasks)
+                    wave, tasks = tasks[:wave_size], tasks[wave_size:]
 
-                # Rate limiting
-                time.sleep(0.1)
+                    for filing_info in executor.map(lambda task: self._download_submission(*task), wave):
+                        if filing_info:
+                            filings.append(filing_info)
 
         except Exception as e:
             print(f"Error downloading 10-K for {ticker}: {str(e)}")
 
         return filings
 
+    def download_10k_bulk(
+        self,
+        specs: List[tuple],
+        prefer_html: bool = True,
+        max_filings: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Download 10-K filings for many companies concurrently
+
+        Args:
+            specs: List of (cik, ticker, start_year, end_year) tuples
+            prefer_html: Prefer HTML format over PDF
+            max_filings: Maximum number of filings to download per company
+            max_workers: Number of companies processed at once (defaults to, and is
+                capped at, the downloader's max_workers, which sizes the connection pool)
+
+        Returns:
+            Dictionary mapping ticker to its list of filing metadata dictionaries
+        """
+        # Each company downloads its filings one at a time, so the total number of
+        # concurrent requests never exceeds the pooled connections. The shared rate
+        # limiter keeps the combined request rate within SEC limits.
+        workers = min(max_workers or self.max_workers, self.max_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda spec: self.download_10k(
+                    *spec, prefer_html=prefer_html, max_filings=max_filings, max_workers=1
+                ),
+                specs
+            )
+            return {spec[1]: filings for spec, filings in zip(specs, results)}
+
     def _download_filing(
         self,
         documents_url: str,
@@ -143,23 +213,27 @@ class SECDownloader:
         """Download individual filing document"""
 
         try:
-            response = self.session.get(documents_url)
+            response = self._get(documents_url)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            table = soup.find('table', {'class': 'tableFile'})
+            table = self._find_table(response.content, 'tableFile')
 
-            if not table:
+            if table is None:
                 return None
 
             # Find the main 10-K document (not the XBRL viewer)
-            for row in table.find_all('tr')[1:]:
-                cols = row.find_all('td')
+            for row in table.xpath('.//tr')[1:]:
+                cols = row.xpath('.//td')
                 if len(cols) < 4:
                     continue
 
-                doc_type = cols[3].text.strip()
-                description = cols[1].text.strip().lower()
+                # Only 10-K rows (or untyped ones) can match, so reject the rest before
+                # building the description text
+                doc_type = cols[3].text_content().strip()
+                if doc_type not in ('10-K', ''):
+                    continue
+
+                description = cols[1].text_content().strip().lower()
 
                 # Skip XBRL viewers and lookup for actual 10-K HTM/HTML files
                 # We want files that are actual 10-K documents, not viewers
@@ -169,60 +243,215 @@ class SECDownloader:
                 # Look for the actual 10-K document file
                 # Usually it's a .htm file with "10-K" in the type column
                 if doc_type == '10-K' or (doc_type == '' and '10-k' in description):
-                    doc_link = cols[2].find('a')
-                    if not doc_link:
+                    doc_links = cols[2].xpath('.//a/@href')
+                    if not doc_links:
                         continue
 
-                    doc_url = f"https://www.sec.gov{doc_link['href']}"
+                    doc_url = _SEC_BASE + doc_links[0]
 
                     # Skip if it's an XBRL viewer page
-                    if 'ix?doc=' in doc_url or 'ixviewer' in doc_url:
+                    if _VIEWER_RE.search(doc_url):
                         # Extract the actual document from the viewer URL
-                        import urllib.parse
-                        parsed = urllib.parse.urlparse(doc_url)
-                        query = urllib.parse.parse_qs(parsed.query)
-                        if 'doc' in query:
+                        doc_param = _DOC_PARAM_RE.search(doc_url)
+                        if doc_param:
                             # Get the actual document path (starts with /)
-                            doc_path = query['doc'][0]
+                            doc_path = unquote_plus(doc_param.group(1))
                             # The doc_path already contains the full path from root
-                            doc_url = f"https://www.sec.gov{doc_path}"
-
-                    file_format = 'html' if doc_url.endswith(('.htm', '.html')) else 'pdf'
+                            doc_url = _SEC_BASE + doc_path
 
-                    # Download document
-                    print(f"  Downloading: {doc_url}")
-                    doc_response = self.session.get(doc_url)
-                    doc_response.raise_for_status()
-
-                    # Check if we got actual content (not a viewer page)
-                    content = doc_response.text if isinstance(doc_response.content, bytes) else doc_response.content
-                    if len(content) < 10000:  # Viewer pages are small
-                        print(f"  Warning: Downloaded file seems small ({len(content)} bytes), might be viewer page")
-                        continue
+                    filing_info = self._download_document(doc_url, ticker, fiscal_year)
+                    if filing_info:
+                        return filing_info
 
-                    # Save to file
-                    company_dir = self.data_dir / ticker
-                    company_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"Error downloading filing document: {str(e)}")
+            return None
 
-                    file_ext = 'html' if file_format == 'html' else 'pdf'
-                    output_file = company_dir / f"{ticker}_{fiscal_year}_10K.{file_ext}"
+    def _list_filings(self, cik: str, start_year: int) -> List[Dict]:
+        """
+        List a company's filings from the SEC submissions API, newest first
 
-                    with open(output_file, 'wb') as f:
-                        f.write(doc_response.content)
+        Args:
+            cik: Central Index Key (CIK) of the company
+            start_year: Earliest filing year of interest (older history files are skipped)
 
-                    print(f"  ✓ Saved {len(doc_response.content)} bytes to {output_file.name}")
+        Returns:
+            List of dictionaries with 'form', 'filingDate', 'accessionNumber'
+            and 'primaryDocument'
+        """
+        response = self._get(f"{_SUBMISSIONS_BASE}/CIK{int(cik):010d}.json")
+        response.raise_for_status()
+        submissions = response.json()
+
+        # Recent filings, plus older history files that overlap the requested years
+        pages = [submissions['filings']['recent']]
+        for history in submissions['filings'].get('files', []):
+            if int(history['filingTo'][:4]) >= start_year:
+                history_response = self._get(f"{_SUBMISSIONS_BASE}/{history['name']}")
+                history_response.raise_for_status()
+                pages.append(history_response.json())
+
+        fields = ('form', 'filingDate', 'accessionNumber', 'primaryDocument')
+        return [
+            dict(zip(fields, values))
+            for page in pages
+            for values in zip(*(page[field] for field in fields))
+        ]
+
+    def _download_submission(
+        self,
+        cik: str,
+        filing: Dict,
+        ticker: str,
+        fiscal_year: int,
+        prefer_html: bool
+    ) -> Optional[Dict]:
+        """Download a filing's primary document, falling back to its index page"""
+        accession = filing['accessionNumber']
+        filing_dir = f"{_ARCHIVES_BASE}/{int(cik)}/{accession.replace('-', '')}"
 
-                    return {
-                        'fiscal_year': fiscal_year,
-                        'format': file_format,
-                        'path': str(output_file),
-                        'url': doc_url
-                    }
+        if not filing['primaryDocument']:
+            # No primary document listed: find it on the filing index page
+            return self._download_filing(f"{filing_dir}/{accession}-index.htm", ticker, fiscal_year, prefer_html)
 
+        try:
+            return self._download_document(f"{filing_dir}/{filing['primaryDocument']}", ticker, fiscal_year)
         except Exception as e:
             print(f"Error downloading filing document: {str(e)}")
             return None
 
+    def _download_document(self, doc_url: str, ticker: str, fiscal_year: int) -> Optional[Dict]:
+        """Stream a filing document to disk; returns None for viewer-sized pages"""
+        file_format = 'html' if doc_url.endswith(('.htm', '.html')) else 'pdf'
+
+        # Download document, streaming it to disk
+        print(f"  Downloading: {doc_url}")
+        with self._get(doc_url, stream=True, headers={'cache-control': 'no-cache'}) as doc_response:
+            doc_response.raise_for_status()
+            body = doc_response.iter_content(chunk_size=65536)
+
+            # Check if we got actual content (not a viewer page) from the first bytes
+            head = b''
+            for chunk in body:
+                head += chunk
+                if len(head) >= 10000:
+                    break
+
+            if len(head) < 10000:  # Viewer pages are small
+                print(f"  Warning: Downloaded file seems small ({len(head)} bytes), might be viewer page")
+                return None
+
+            # Save to file
+            company_dir = self._company_dir(ticker)
+
+            file_ext = 'html' if file_format == 'html' else 'pdf'
+            output_file = company_dir / f"{ticker}_{fiscal_year}_10K.{file_ext}"
+
+            # Stream to a uniquely named partial file and rename it once complete, so an
+            # interrupted download never leaves a truncated filing under the final name
+            # and concurrent downloads for the same year never write the same file
+            part_file = output_file.with_name(f"{output_file.name}.{os.getpid()}-{threading.get_ident()}.part")
+            try:
+                with open(part_file, 'wb') as f:
+                    f.write(head)
+                    total_bytes = len(head)
+                    for chunk in body:
+                        f.write(chunk)
+                        total_bytes += len(chunk)
+            except BaseException:
+                part_file.unlink(missing_ok=True)
+                raise
+
+            os.replace(part_file, output_file)
+
+        print(f"  ✓ Saved {total_bytes} bytes to {output_file.name}")
+
+        return {
+            'fiscal_year': fiscal_year,
+            'format': file_format,
+            'path': str(output_file),
+            'url': doc_url
+        }
+
+    def _company_dir(self, ticker: str) -> Path:
+        """Output directory for a company, created on first use"""
+        company_dir = self.data_dir / ticker
+        if ticker not in self._created_dirs:
+            company_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(ticker)
+        return company_dir
+
+    def _create_session(self, cache_expire_after: Optional[int]) -> requests.Session:
+        """Create the HTTP session, disk-cached for index pages if requests-cache is installed"""
+        if cache_expire_after is None:
+            return requests.Session()
+
+        try:
+            import requests_cache
+        except ImportError:
+            return requests.Session()
+
+        # Filing lists and filing indexes change at most daily; documents are never cached
+        return requests_cache.CachedSession(
+            cache_name=str(self.data_dir / '.http_cache'),
+            backend='sqlite',
+            allowable_methods=('GET',),
+            urls_expire_after={
+                'data.sec.gov/submissions/*': cache_expire_after,
+                'www.sec.gov/Archives/edgar/data/*-index.htm*': cache_expire_after,
+                '*': requests_cache.DO_NOT_CACHE
+            }
+        )
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the shared rate limiter, backing off exponentially on HTTP 429"""
+        for attempt in range(self.max_retries + 1):
+            self._rate_limit.wait()
+            response = self.session.get(url, **kwargs)
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            response.close()
+
+            # Honour Retry-After when given, otherwise back off 1s, 2s, 4s, ...
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else 2.0 ** attempt
+            time.sleep(delay)
+
+        return response
+
+    def _find_table(self, content: bytes, css_class: str, feed_size: int = 65536):
+        """
+        Find the first table carrying a CSS class, parsing only as far as needed
+
+        The page is fed to an incremental parser and parsing stops as soon as
+        the matching table has been closed, so the rest of the page is skipped.
+
+        Args:
+            content: Raw HTML bytes
+            css_class: CSS class of the wanted table
+            feed_size: Bytes fed to the parser at a time
+
+        Returns:
+            The table element, or None if the page has no such table
+        """
+        parser = etree.HTMLPullParser(events=('end',), tag='table')
+        parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+
+        for start in range(0, len(content), feed_size):
+            parser.feed(content[start:start + feed_size])
+            for _, table in parser.read_events():
+                if css_class in table.get('class', '').split():
+                    return table
+
+        parser.close()
+        for _, table in parser.read_events():
+            if css_class in table.get('class', '').split():
+                return table
+
+        return None
+
     def download_xbrl(
         self,
         cik: str,